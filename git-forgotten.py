@@ -56,12 +56,13 @@ def git_repo_folders(parent):
 
 
 class MultiGit:
+    HEADING_PREFIX = colorama.Style.BRIGHT + colorama.Back.BLUE
+
     def __init__(self, parent, args):
         """
         Initialiser.
         """
         self.args = args if args else ['diff', '--stat', '--color']
-        self.encoding = 'utf-8'
         self.parent = self.clean_path(parent)
 
     def clean_path(self, path):
@@ -86,12 +87,12 @@ class MultiGit:
         Run git 'inside' repo and print output, if not empty.
         """
         args = ['git'] + args
-        process = subprocess.run(args, stdout=subprocess.PIPE)
+        process = subprocess.run(
+            args, stdout=subprocess.PIPE, encoding='utf-8', errors='replace',
+        )
         if process.stdout:
-            heading = f"{repo:<80}"
-            print(colorama.Style.BRIGHT + colorama.Back.BLUE + heading)
-            stdout = process.stdout.decode(self.encoding).strip()
-            print(stdout)
+            print(f"{self.HEADING_PREFIX}{repo:<80}")
+            print(process.stdout.strip())
             print()
 
 
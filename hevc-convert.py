@@ -189,11 +189,40 @@ def secure_copy(old: Path, new: Path, exist_ok: bool = False) -> None:
     """
 
 
+def video_codec(video: Path) -> str:
+    """
+    Find codec used by the first video stream in given file.
+
+    Only the container's header is read, so this is very fast.
+
+    Args:
+        video:
+            Path to input file.
+
+    Returns:
+        Codec name as reported by ffprobe, eg. 'hevc' or 'h264'.
+    """
+    args = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        str(video),
+    ]
+    process = subprocess.run(args, capture_output=True, check=True, text=True)
+    return process.stdout.strip()
+
+
 def main(options: argparse.Namespace) -> int:
     videos = [Path(name) for name in options.videos]
 
     with TemporaryDirectory(prefix='hevc-convert-') as temp_folder:
         for video in videos:
+            # Re-encoding is slow and lossy; skip videos already converted
+            if not options.force and video_codec(video) == 'hevc':
+                print(f"Skipping video already in HEVC: {video.name}")
+                continue
             hevc_convert(video, Path(temp_folder), options)
 
     return 0
@@ -223,6 +252,13 @@ def parse_arguments(args: list[str]) -> argparse.Namespace:
         help='improve video quality by changing x265 CRF value from 28 to 26',
     )
 
+    parser.add_argument(
+        '-f',
+        '--force',
+        action='store_true',
+        help='recompress videos even if they are already HEVC',
+    )
+
     # Audio
     parser.add_argument(
         '--stereo',
@@ -20,6 +20,7 @@ For example:
 
 import argparse
 import collections
+import os
 from pathlib import Path
 import re
 import sys
@@ -28,7 +29,7 @@ from typing import Optional
 from pprint import pprint as pp
 
 
-def find_movie_folders(root: Path) -> dict[int, list[Path]]:
+def find_movie_folders(root: Path) -> dict[int, list[os.DirEntry]]:
     """
     Find folders matching expected name pattern .
 
@@ -36,18 +37,19 @@ def find_movie_folders(root: Path) -> dict[int, list[Path]]:
     parentheses. For example: "1984 (1984)"
     """
     movies = collections.defaultdict(list)
-    for path in root.iterdir():
-        year = extract_year(path)
-        if year is not None:
-            movies[year].append(path)
+    with os.scandir(root) as entries:
+        for entry in entries:
+            year = extract_year(entry.name)
+            if year is not None:
+                movies[year].append(entry)
     return movies
 
 
-def extract_year(path: Path) -> Optional[int]:
+def extract_year(name: str) -> Optional[int]:
     """
     Extract the movie's year or return None.
     """
-    if not (match := re.search(r"\((\d\d\d\d)\)$", path.name)):
+    if not (match := re.search(r"\((\d\d\d\d)\)$", name)):
         return None
 
     year = int(match.group(1))
@@ -66,18 +68,24 @@ def from_subfolders(root: Path) -> tuple[int, int]:
     def is_year(name):
         return bool(match := re.match(r"\d\d\d\d", name))
 
-    count = 0
-    for path in root.iterdir():
-        # Move items out of 'year' folders.
-        if not is_year(path.name):
-            continue
+    # Plain strings and `os.rename()` avoid creating a `Path` per movie
+    root_str = str(root)
+    with os.scandir(root) as entries:
+        year_folders = [entry.path for entry in entries if is_year(entry.name)]
 
-        for subpath in path.iterdir():
-            subpath.rename(path.parent / subpath.name)
+    count = 0
+    for year_folder in year_folders:
+        # Move items out of 'year' folders. Read the whole listing first, as
+        # changing a folder while reading it can cause entries to be skipped.
+        with os.scandir(year_folder) as subentries:
+            names = [subentry.name for subentry in subentries]
+        for name in names:
+            source = os.path.join(year_folder, name)
+            os.rename(source, os.path.join(root_str, name))
             count += 1
 
         # Remove empty year folders
-        path.rmdir()
+        os.rmdir(year_folder)
 
     return count
 
@@ -94,17 +102,16 @@ def into_subfolders(root: Path) -> tuple[int, int]:
         Counts of folders moved, year folders created.
     """
     movies = find_movie_folders(root)
+    root_str = str(root)
     count = 0
-    for year in movies:
+    for year, folders in movies.items():
         # Create folder for year?
-        destination = root / str(year)
-        if not destination.exists():
-            destination.mkdir()
+        destination = os.path.join(root_str, str(year))
+        os.makedirs(destination, exist_ok=True)
 
-        # Movie movies
-        folders = movies[year]
+        # Move movies, using plain strings to avoid `Path` overhead
         for folder in folders:
-            folder.rename(destination / folder.name)
+            os.rename(folder.path, os.path.join(destination, folder.name))
             count += 1
 
     return count
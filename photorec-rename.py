@@ -13,7 +13,9 @@ See:
 import argparse
 import datetime
 import logging
+import os
 from pathlib import Path
+import re
 import shutil
 import sys
 from typing import Iterator, Optional
@@ -22,6 +24,9 @@ from PIL import UnidentifiedImageError
 from PIL.Image import Exif, Image, open as open_image
 
 
+EXIF_DATETIME_REGEX = re.compile(r'^(\d{4}):(\d\d):(\d\d) (\d\d):(\d\d):(\d\d)$')
+JPEG_MAGIC = b'\xff\xd8\xff'
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +42,8 @@ def argparse_empty_folder(string: str) -> Path:
         Path to existing folder.
     """
     path = argparse_existing_folder(string)
-    is_empty = not any(path.iterdir())
+    with os.scandir(path) as entries:
+        is_empty = next(entries, None) is None
     if not is_empty:
         message = f"Folder is not empty: {path}"
         raise argparse.ArgumentTypeError(message)
@@ -80,6 +86,28 @@ def build_file_name(image: Image) -> Optional[str]:
     return f"{date}.{image.format.lower()}"
 
 
+def is_jpeg(path: Path) -> bool:
+    """
+    Cheaply check for the JPEG start-of-image marker.
+
+    Much faster than letting Pillow try (and fail) to identify the many
+    non-image files that photorec recovers.
+
+    Args:
+        path:
+            Path to file.
+
+    Return:
+        True if file starts with the JPEG magic bytes.
+    """
+    try:
+        with open(path, 'rb') as fp:
+            return fp.read(3) == JPEG_MAGIC
+    except OSError as e:
+        logger.warning("%s: %s", e, path)
+        return False
+
+
 def list_files(root: Path) -> Iterator[Path]:
     """
     Recursively list files under root.
@@ -105,7 +133,9 @@ def read_image(path: Path) -> Optional[Image]:
             Path to image file.
 
     Return:
-        An Image object, or None if input wasn't an image.
+        An Image object, or None if input wasn't an image. Caller is
+        responsible for closing the image, eg. by using it as a context
+        manager.
     """
     # Attempt to open as image
     try:
@@ -130,30 +160,47 @@ def parse_datetime(exif: Exif) -> Optional[datetime.datetime]:
             Datetime in exif format 'YYYY:MM:DD HH:MM:SS'
 
     Returns:
-        Datetime, or none if datetime not present.
+        Datetime, or none if datetime not present or malformed.
     """
     string = exif.get(306)
     if string is None:
         return None
 
-    parsed = datetime.datetime.strptime(string, "%Y:%m:%d %H:%M:%S")
+    # Much faster than `datetime.strptime()`
+    match = EXIF_DATETIME_REGEX.match(string)
+    if match is None:
+        logger.debug("Malformed Exif DateTime %r", string)
+        return None
+
+    try:
+        parsed = datetime.datetime(*map(int, match.groups()))
+    except ValueError:
+        logger.debug("Invalid Exif DateTime %r", string)
+        return None
     return parsed
 
 
 def main(options: argparse.Namespace) -> int:
     for path in list_files(options.photorec):
+        # Ignore non-JPEG files without involving Pillow
+        if not is_jpeg(path):
+            continue
+
         image = read_image(path)
 
         # Ignore non-image files
         if not image:
             continue
 
-        # Ignore small images
-        if image.height < 1000:
-            continue
+        # Release file handle as soon as header has been examined
+        with image:
+            # Ignore small images
+            if image.height < 1000:
+                continue
+
+            # Calculate new name
+            file_name = build_file_name(image)
 
-        # Calculate new name
-        file_name = build_file_name(image)
         if not file_name:
             continue
 
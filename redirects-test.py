@@ -10,14 +10,33 @@ http://www.lost.co.nz/ -> 301 -> https://lost.co.nz/ -> 200
 """
 
 import argparse
-from collections import defaultdict
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import dbm
+from functools import lru_cache
+import io
+from itertools import repeat
+from pathlib import Path
 from pprint import pprint as pp
-from typing import List, Optional, Tuple
+import re
+import shelve
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 import socket
 import sys
 from urllib.parse import urlsplit, urlunsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+
+
+# Successful DNS lookups are remembered between runs
+DNS_CACHE_PATH = Path('~/.cache/redirects-test/dns').expanduser()
+DNS_CACHE_TTL = 300
+
+# Checks spend nearly all their time waiting on the network
+MAX_WORKERS = 32
 
 
 def add_hostname_prefix(url: str, prefix: str):
@@ -68,6 +87,19 @@ def clean_url(
     Returns:
         A list of URLs to test
     """
+    # Fast path for URLs already in canonical form, with a hostname and path.
+    # Only plain, printable ASCII, as `urlsplit()` strips whitespace and
+    # control characters.
+    netloc_start = url.find('//') + 2
+    if (
+        url.startswith(('http://', 'https://'))
+        and url.find('/', netloc_start) > netloc_start
+        and url.isascii()
+        and url.isprintable()
+        and not any(char in url for char in ' ?#[]')
+    ):
+        return url
+
     # Build first URL
     if '//' not in url:
         url = f"{default_scheme}://{url}"
@@ -77,6 +109,57 @@ def clean_url(
     return url
 
 
+class DNSCache:
+    """
+    Thread-safe, on-disk cache of hostname to address, with expiry.
+
+    The cache file is only opened on first use. If it cannot be opened,
+    lookups are cached in memory only.
+    """
+    def __init__(self, path: Path, ttl: float):
+        self.lock = threading.Lock()
+        self.path = path
+        self.shelf = None
+        self.ttl = ttl
+
+    def get(self, hostname: str) -> Optional[str]:
+        """
+        Return cached address, or None if missing or expired.
+        """
+        with self.lock:
+            entry = self.open().get(hostname)
+        if entry is None:
+            return None
+        address, expires = entry
+        return address if expires > time.time() else None
+
+    def set(self, hostname: str, address: str) -> None:
+        """
+        Remember address for `ttl` seconds.
+        """
+        with self.lock:
+            self.open()[hostname] = (address, time.time() + self.ttl)
+
+    def close(self) -> None:
+        with self.lock:
+            if isinstance(self.shelf, shelve.Shelf):
+                self.shelf.close()
+            self.shelf = None
+
+    def open(self):
+        if self.shelf is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.shelf = shelve.open(str(self.path))
+            except (OSError, dbm.error):
+                self.shelf = {}
+            atexit.register(self.close)
+        return self.shelf
+
+
+dns_cache = DNSCache(DNS_CACHE_PATH, DNS_CACHE_TTL)
+
+
 def dns_lookup(url: str) -> Tuple[str, str]:
     """
     Attempt to resolve single hostname to a IPv4 address.
@@ -92,17 +175,80 @@ def dns_lookup(url: str) -> Tuple[str, str]:
     assert '//' in url, f"Expected absolute URL, given: {url!r}"
     parts = urlsplit(url)
     hostname = parts.netloc
+    address = resolve_hostname(hostname)
+    return (hostname, address)
+
+
+@lru_cache(maxsize=1024)
+def resolve_hostname(hostname: str) -> Optional[str]:
+    """
+    Resolve hostname to an IPv4 address, remembering the result.
+
+    Args:
+        hostname:
+            Hostname to lookup, eg. 'lost.co.nz'
+
+    Returns:
+        Address as a string, or None if lookup failed.
+    """
+    address = dns_cache.get(hostname)
+    if address is not None:
+        return address
 
     try:
         address = socket.gethostbyname(hostname)
-    except OSError as e:
-        address = None
-    return (hostname, address)
+    except OSError:
+        return None
+
+    dns_cache.set(hostname, address)
+    return address
+
+
+def resolve_all(urls: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Resolve the hostnames of all the given URLs concurrently.
+
+    Args:
+        urls:
+            Absolute URLs to lookup DNS for.
+
+    Returns:
+        Dictionary mapping hostname to address, or None if lookup failed.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return dict(executor.map(dns_lookup, urls))
+
+
+def build_session() -> requests.Session:
+    """
+    Create session to share connections between checks.
+
+    Many of the URLs checked share a hostname, so keeping connections alive
+    saves repeating the TCP and TLS handshakes.
+
+    Returns:
+        Session with connection pool sized for `MAX_WORKERS` threads.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS,
+        pool_maxsize=MAX_WORKERS * 2,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 class RedirectChecker:
-    def __init__(self, url):
+    def __init__(
+        self,
+        url: str,
+        session: requests.Session,
+        addresses: Optional[Dict[str, Optional[str]]] = None,
+    ):
+        self.addresses = {} if addresses is None else addresses
         self.error = None
+        self.session = session
         self.url = url
         self.response = self.get()
 
@@ -114,7 +260,7 @@ class RedirectChecker:
             Response if possible, None on error.
         """
         try:
-            response = requests.get(self.url, allow_redirects=True, timeout=5.0)
+            response = self.session.get(self.url, allow_redirects=True, timeout=5.0)
             response.raise_for_status()
             return response
         except requests.exceptions.Timeout:
@@ -122,7 +268,11 @@ class RedirectChecker:
         except requests.exceptions.TooManyRedirects:
             self.error = 'REDIRECT LOOP'
         except requests.exceptions.ConnectionError as e:
-            hostname, ip = dns_lookup(self.url)
+            hostname = urlsplit(self.url).netloc
+            if hostname in self.addresses:
+                ip = self.addresses[hostname]
+            else:
+                hostname, ip = dns_lookup(self.url)
             if ip is None:
                 self.error = 'DNS ERROR'
             else:
@@ -176,33 +326,43 @@ def print_checkers(
     for checker in checkers:
         histories.append(checker.get_history())
 
+    # Strip any one of the prefixes from the start of hostname
+    prefix_regex = None
+    if prefixes:
+        alternatives = '|'.join(re.escape(prefix) for prefix in prefixes)
+        prefix_regex = re.compile(f"^(?:{alternatives})")
+
     def key(history):
+        # Only the hostname is needed, so skip the full `urlsplit()`
         url = history[0][0]
-        parts = urlsplit(url)
-        domain = parts.netloc
+        domain = url.split('/', 3)[2]
         base = domain
-        for prefix in prefixes:
-            if base.startswith(prefix):
-                base = base.removeprefix(prefix)
-                break
+        if prefix_regex is not None:
+            base = prefix_regex.sub('', domain, count=1)
         return base, domain
 
     histories = sorted(histories, key=key)
 
-    # Calculate with of each column
-    longest = defaultdict(int)
+    # Calculate width of each column
+    num_columns = max((len(history) for history in histories), default=0)
+    longest = [0] * num_columns
     for history in histories:
         for index, (url, code) in enumerate(history):
-            longest[index] = max(len(url), longest[index])
+            length = len(url)
+            if length > longest[index]:
+                longest[index] = length
 
-    # Print columns
+    # Print columns, using a single write for the whole table
+    buffer = io.StringIO()
     for history in histories:
         parts = []
         for index, (url, code) in enumerate(history):
             longest_url = longest[index]
             parts.append(f"{url:<{longest_url}}")
             parts.append(f"{code}")
-        print(' -> '.join(parts))
+        buffer.write(' -> '.join(parts))
+        buffer.write('\n')
+    sys.stdout.write(buffer.getvalue())
 
 
 class Main:
@@ -216,11 +376,20 @@ class Main:
         plural = 'URL' if num_urls == 1 else 'URLs'
         print(f"Checking {num_urls:,} {plural}")
 
-        # Check URLs
-        checkers = []
-        for url in self.url_list:
-            checker = RedirectChecker(url)
-            checkers.append(checker)
+        # Resolve all hostnames up-front
+        self.addresses = resolve_all(self.url_list)
+
+        # Check URLs concurrently
+        with (
+            build_session() as session,
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor,
+        ):
+            checkers = list(executor.map(
+                RedirectChecker,
+                self.url_list,
+                repeat(session),
+                repeat(self.addresses),
+            ))
 
         # Print output
         print_checkers(checkers, self.prefixes)
@@ -273,11 +442,12 @@ class Main:
         """
         Read lines form text file, skipping blank lines. and comments.
         """
+        text = textio.read()
+        textio.close()
         lines = [
-            stripped for line in textio
+            stripped for line in text.splitlines()
             if (stripped := line.strip()) and not stripped.startswith('#')
         ]
-        textio.close()
         return lines
 
     def parse(self, arguments: List[str]) -> argparse.Namespace:
@@ -16,13 +16,30 @@ TODO:
 """
 
 import argparse
+import ctypes
 from dataclasses import dataclass
 from enum import Enum
+import errno
+import os
 from pathlib import Path
 import re
 import sys
 
-import colorama
+# ANSI escape codes need translating on Windows only
+if sys.platform == 'win32':
+    import colorama
+
+# Regex internals, used only to find literals required by a pattern. These
+# are private, so if neither is importable just skip that optimisation.
+try:
+    from re import _parser as sre_parse
+    from re._constants import LITERAL
+except ImportError:
+    try:                                        # Python < 3.11
+        import sre_parse
+        from sre_constants import LITERAL
+    except ImportError:
+        sre_parse = None
 
 
 def parse_arguments(args):
@@ -71,6 +88,38 @@ def parse_arguments(args):
     return options
 
 
+def required_literal(pattern):
+    """
+    Find the longest literal string that every match of pattern must contain.
+
+    Only literals at the top-level of the pattern are considered, so this
+    is conservative: an empty string is returned whenever in doubt, or if
+    the regex parser internals are unavailable.
+
+    Args:
+        pattern: Compiled regular expression.
+
+    Returns: Literal string, possibly empty.
+    """
+    if sre_parse is None or pattern.flags & re.IGNORECASE:
+        return ''
+
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return ''
+
+    longest = ''
+    current = []
+    for opcode, argument in parsed:
+        if opcode is LITERAL:
+            current.append(chr(argument))
+        else:
+            longest = max(longest, ''.join(current), key=len)
+            current = []
+    return max(longest, ''.join(current), key=len)
+
+
 def path_type(path):
     """
     Give the english name for the type of file-system entry given.
@@ -85,12 +134,49 @@ def path_type(path):
         return 'entry'
 
 
+def load_renameat2():
+    """
+    Find the `renameat2()` function in Linux's C library.
+
+    It can refuse to overwrite an existing entry atomically, in the kernel,
+    using the `RENAME_NOREPLACE` flag.
+
+    Returns: Function, or None if not available on this platform.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        function = libc.renameat2
+    except (AttributeError, OSError):
+        return None
+
+    function.argtypes = [
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    function.restype = ctypes.c_int
+    return function
+
+
+RENAME_NOREPLACE = 1
+renameat2 = load_renameat2()
+
+
 class Colour(Enum):
-    BLUE = colorama.Fore.BLUE
-    GREEN = colorama.Fore.GREEN
-    RED = colorama.Fore.RED + colorama.Style.BRIGHT
-    WHITE = colorama.Fore.WHITE
-    YELLOW = colorama.Fore.YELLOW + colorama.Style.BRIGHT
+    BLUE = '\x1b[34m'
+    GREEN = '\x1b[32m'
+    RED = '\x1b[31m\x1b[1m'
+    WHITE = '\x1b[37m'
+    YELLOW = '\x1b[33m\x1b[1m'
+
+
+# Hot-loop shortcuts
+GREEN = Colour.GREEN.value
+RED = Colour.RED.value
+RESET = '\x1b[0m'
+USE_COLOUR = sys.stdout.isatty()
 
 
 class Terminal:
@@ -100,8 +186,11 @@ class Terminal:
 
     @staticmethod
     def print(string, colour=Colour.WHITE, *, file=sys.stdout):
-        parts = [colour.value, string, colorama.Style.RESET_ALL]
-        print(''.join(parts), file=file)
+        # No escape codes if output is redirected
+        if file.isatty():
+            parts = [colour.value, string, RESET]
+            string = ''.join(parts)
+        print(string, file=file)
 
 
 @dataclass
@@ -159,12 +248,19 @@ class Renamer:
 
         If either problem is detected, details will be printed and we will
         abort directly.
+
+        Existing entries are checked on the filesystem itself, rather than
+        against a listing of names, so that case-insensitive filesystems
+        (eg. macOS) match names the same way that `rename()` will.
+
+        Args:
+            renames: List of `Rename` objects.
         """
         seen = {}
         for rename in renames:
-            path_new = self.folder / rename.new
             # Existing folder entry
-            if path_new.exists():
+            path_new = self.folder / rename.new
+            if os.path.lexists(path_new):
                 message = "Existing {} would be overwritten: {!r}"
                 raise RenameError(message.format(path_type(path_new), rename.new))
 
@@ -181,11 +277,11 @@ class Renamer:
         Make it happen.
         """
         # Read folder
-        paths = self.list()
+        entries = self.list()
 
         # Pre-Calculate renames
         renames = self.calculate(
-            paths,
+            entries,
             self.config.search_regex,
             self.config.replace_template,
             self.config.preserve_suffix,
@@ -208,17 +304,51 @@ class Renamer:
     def execute(self, renames):
         """
         Actually perform the rename operations.
+
+        Existing entries are never overwritten, even if one appears after our
+        pre-flight check.
+        """
+        if renameat2 is None:
+            self.execute_fallback(renames)
+            return
+
+        dir_fd = os.open(self.folder, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            for rename in renames:
+                old = os.fsencode(rename.old)
+                new = os.fsencode(rename.new)
+                if renameat2(dir_fd, old, dir_fd, new, RENAME_NOREPLACE) == 0:
+                    continue
+
+                error = ctypes.get_errno()
+                if error == errno.EEXIST:
+                    message = "Rename target {!r} already exists. Aborting."
+                    raise RenameError(message.format(rename.new))
+
+                # Flag not supported by filesystem, do it the slow way
+                if error in (errno.EINVAL, errno.ENOSYS):
+                    self.execute_fallback([rename])
+                    continue
+
+                raise OSError(error, os.strerror(error), rename.old)
+        finally:
+            os.close(dir_fd)
+
+    def execute_fallback(self, renames):
         """
+        Perform rename operations where `renameat2()` is not available.
+        """
+        folder = os.fspath(self.folder)
+        join = os.path.join
         for rename in renames:
             # Double check that we don't over-write existing file.
             # This should never happen, but... you know.
-            new = self.folder / rename.new
-            if new.exists():
+            new = join(folder, rename.new)
+            if os.path.lexists(new):
                 message = "Rename target {!r} already exists. Aborting."
-                raise RenameError(message.format(new))
+                raise RenameError(message.format(rename.new))
 
-            path = self.folder / rename.old
-            path.rename(new)
+            os.rename(join(folder, rename.old), new)
 
     def print_entry(self, path):
         """
@@ -233,28 +363,25 @@ class Renamer:
         """
         Highlight the matched part of the orignal string.
         """
+        # No escape codes if output is redirected
+        if USE_COLOUR:
+            red, green, reset = RED, GREEN, RESET
+        else:
+            red = green = reset = ''
+
+        lines = []
         for rename in renames:
             old, start, end = rename.old, rename.match_start, rename.match_end
-            parts = []
-            add = parts.append
-
-            # Prefix
-            add(old[:start])
-
-            # Matched
-            add(Colour.RED.value)
-            add(old[start:end])
-            add(colorama.Style.RESET_ALL)
-
-            # Replaced
-            add(Colour.GREEN.value)
-            add(rename.replaced)
-            add(colorama.Style.RESET_ALL)
+            lines.append(
+                f"{old[:start]}"                            # Prefix
+                f"{red}{old[start:end]}{reset}"             # Matched
+                f"{green}{rename.replaced}{reset}"          # Replaced
+                f"{old[end:]}\n"                            # Suffix
+            )
 
-            # Suffix
-            add(old[end:])
-
-            print(''.join(parts))
+        # Single write is much faster than a print() per line
+        sys.stdout.write(''.join(lines))
+        sys.stdout.flush()
 
     def print_summary(self, renames):
         status = f"{len(renames)} renames from {self.num_entries} entries"
@@ -270,69 +397,81 @@ class Renamer:
             root: `Path` to root folder.
             use_hidden: list entries that start with a period.
 
-        Returns: List of `Path` objects.
+        Returns: List of `os.DirEntry` objects, sorted by name.
         """
         allow_hidden = not self.config.show_all
-        entries = []
-        for entry in self.folder.iterdir():
-            if allow_hidden and entry.name.startswith('.'):
-                continue
-            entries.append(entry)
-        entries.sort()
+        with os.scandir(self.folder) as iterator:
+            entries = [
+                entry for entry in iterator
+                if not (allow_hidden and entry.name.startswith('.'))
+            ]
+        entries.sort(key=lambda entry: entry.name)
         return entries
 
-    def calculate(self, paths, search, replace, preserve_suffix):
+    def calculate(self, entries, search, replace, preserve_suffix):
         """
         Build a list of renames to perform.
 
         Args:
-            entries: Iterable of folder entries
+            entries: Iterable of `os.DirEntry` folder entries
             search: Search regex.
             replace: Replacement template.
             preserve_suffix: Do not do any renames on suffix
 
         Returns:
-            List of 2-tuples. The first element is a `Path` object for a folder
-            entry, the second is string with the new name.
+            List of `Rename` objects.
         """
         # Flags
         flags = 0
         if self.config.ignore_case:
             flags |= re.IGNORECASE
 
+        # Templates without backslashes contain neither group references nor
+        # escapes, so we can skip `Match.expand()` re-parsing them every time.
+        if '\\' in replace:
+            def expand(match):
+                return match.expand(replace)
+        else:
+            def expand(match):
+                return replace
+
         # Time to match
         search = re.compile(search, flags=flags)
+        literal = required_literal(search)
         self.num_entries = 0
         renames = []
-        for path in paths:
+        for entry in entries:
             self.num_entries += 1
+            name = entry.name
 
             # Keep suffix as is?
             if preserve_suffix:
-                haystack = path.stem
-                suffix = path.suffix
+                haystack, suffix = os.path.splitext(name)
             else:
-                haystack = path.name
+                haystack = name
                 suffix = ''
 
-            # Find match
+            # Find match, skipping regex engine if it can't possibly match
+            if literal and literal not in haystack:
+                continue
             match = search.search(haystack)
             if match:
                 self.num_matches += 1
                 start, end = match.span()
-                replaced = match.expand(replace)
+                replaced = expand(match)
                 new = haystack[:start] + replaced + haystack[end:] + suffix
 
                 # Nothing to do?
-                if path.name == new:
+                if name == new:
                     continue
 
-                renames.append(Rename(path.name, new, *match.span(), replaced))
+                renames.append(Rename(name, new, *match.span(), replaced))
         return renames
 
 
 if __name__ == '__main__':
-    colorama.init()
+    if sys.platform == 'win32':
+        colorama.init()
     options = parse_arguments(sys.argv[1:])
     config = RenamerConfiguration(**vars(options))
     renamer = Renamer(Path.cwd(), config)
@@ -8,7 +8,7 @@ folder contains a folder called 'target' AND a file called `Cargo.toml` it
 is considered to need cleaning.
 """
 
-import contextlib
+from concurrent.futures import ThreadPoolExecutor
 import os
 from pathlib import Path
 import subprocess
@@ -16,31 +16,37 @@ import sys
 from typing import Iterator
 
 
-@contextlib.contextmanager
-def chdir(folder: Path) -> Iterator[None]:
-    """
-    Context manager to temporarily change the current working directory.
-
-    Note that as of Python 3.11 the standard library provides its own
-    `contextlib.chdir()`, which does the same thing.
-    """
-    curdir = os.getcwd()
-    os.chdir(folder)
-    try:
-        yield
-    finally:
-        os.chdir(curdir)
+# Folders inside a Rust project that will never contain another project
+IGNORED_FOLDERS = frozenset(('src', 'target'))
 
 
 def clean(folder: Path) -> str:
     """
     Run the 'cargo clean' command in the given folder.
+
+    Uses the `cwd` argument rather than changing the current directory, so is
+    safe to run from multiple threads at once. Output is streamed rather than
+    captured, keeping only the last line (the summary) in memory.
+
+    Raises:
+        subprocess.CalledProcessError:
+            If cargo exits with a non-zero status.
     """
-    with chdir(folder):
-        args = ['cargo', 'clean']
-        result = subprocess.run(args, capture_output=True, check=True, text=True)
-        message = result.stderr.strip()
-        return message
+    args = ['cargo', 'clean']
+    with subprocess.Popen(
+        args,
+        cwd=folder,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+    ) as process:
+        line = ''
+        for line in process.stderr:
+            pass
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args)
+    message = line.strip()
+    return message
 
 
 def find_unclean(root: Path) -> Iterator[Path]:
@@ -48,7 +54,8 @@ def find_unclean(root: Path) -> Iterator[Path]:
     Recursive generator over folders found under given root.
 
     Skips hidden folders, ie. those starting with a period, as we don't need
-    to explore inside `.git`, for example.
+    to explore inside `.git`, for example. Also skips `IGNORED_FOLDERS`, but
+    only within a Rust project, so that eg. `~/src/` is still searched.
 
     Args:
         root:
@@ -58,23 +65,27 @@ def find_unclean(root: Path) -> Iterator[Path]:
         Yields paths to folders containing a `target` subfolder and the
         file `Cargo.toml`.
     """
-    ignored_folders = ('.git', 'src', 'target')
-    for (dirpath, dirnames, filenames) in root.walk():
-        # Don't recurse in ignored folders
-        if dirpath.name.startswith('.'):
-            dirnames.clear()
-            continue
-
+    for (dirpath, dirnames, filenames) in os.walk(root):
         # Projects contain a file called 'Cargo.toml' and a folder called 'target'
-        if 'target' in dirnames and 'Cargo.toml' in filenames:
-            yield dirpath
+        is_project = 'Cargo.toml' in filenames
+        if is_project and 'target' in dirnames:
+            yield Path(dirpath)
+
+        # Don't recurse into hidden folders, nor ignored ones within projects
+        ignored = IGNORED_FOLDERS if is_project else frozenset()
+        dirnames[:] = [
+            name for name in dirnames
+            if not (name.startswith('.') or name in ignored)
+        ]
 
 
 def main(root: Path) -> int:
-    for project in find_unclean(root):
-        message = clean(project)
-        folder = os.path.relpath(project, root)
-        print(f"From {folder}\n  {message}", file=sys.stderr)
+    # Cleaning is mostly waiting on the filesystem, so overlap projects
+    projects = list(find_unclean(root))
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for project, message in zip(projects, executor.map(clean, projects)):
+            folder = os.path.relpath(project, root)
+            print(f"From {folder}\n  {message}", file=sys.stderr)
     return 0
 
 
@@ -10,42 +10,56 @@ For example::
 
     $ sitemaps-test.py lost.co.nz
     Downloaded 327B from: https://lost.co.nz/sitemap.xml
+    Downloaded 1.6kB from: https://lost.co.nz/sitemap-links.xml
+    Downloaded 2.3kB from: https://lost.co.nz/sitemap-articles.xml
+    Downloaded 1.2kB from: https://lost.co.nz/sitemap-projects.xml
         Sitemap index found containing 3 URLs
 
-    Downloaded 1.6kB from: https://lost.co.nz/sitemap-links.xml
         Found 12 URLs, 12 lastmod, 12 changefreq, and 12 priority fields
-    Downloaded 2.3kB from: https://lost.co.nz/sitemap-articles.xml
         Found 17 URLs, 17 lastmod, 17 changefreq, and 17 priority fields
-    Downloaded 1.2kB from: https://lost.co.nz/sitemap-projects.xml
         Found 9 URLs, 9 lastmod, 9 changefreq, and 9 priority fields
 
     Total of 39 URLs found in 4 files
 
 
 Requires:
-    Python 3.9+ and the 3rd-party `requests` library for HTTP downloads.
+    Python 3.10+ and the 3rd-party `requests` library for HTTP downloads.
 
 """
 
 import argparse
-import collections
-from dataclasses import dataclass
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
-import functools
-import io
+import gzip
 import logging
 import math
 import sys
-from typing import IO, Iterator, List, Optional, TypeAlias
+from typing import IO, Iterable, Iterator, List, Optional, TypeAlias
 from urllib.parse import SplitResult, urlsplit, urlunsplit
 from xml.etree import ElementTree
 
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
 
 
 logger = logging.getLogger(__name__)
 
 
+# Lower bounds and decimal places for `round_significant_2()`
+ROUND_SIGNIFICANT_2 = ((1000, -2), (100, -1), (10, 0), (1, 1), (0.1, 2))
+
+# Bytes fed to XML parser at a time
+CHUNK_SIZE = 64 * 1024
+
+# Maximum number of sitemaps to download at once
+MAX_WORKERS = 10
+
+# First two bytes of every gzip file
+GZIP_MAGIC = b'\x1f\x8b'
+
 XML: TypeAlias = Iterator[ElementTree.Element]
 
 
@@ -83,14 +97,20 @@ def file_size(size: int, traditional: bool = False) -> str:
         1024: ['KiB', 'MiB', 'GiB', 'TiB', 'PiB', 'EiB', 'ZiB', 'YiB']
     }
 
+    # Calculate exponent directly, using integer maths to avoid rounding errors
     multiple = 1024 if traditional else 1000
-    divided = float(size)
-    for suffix in suffixes[multiple]:
-        divided /= multiple
-        if divided < multiple:
-            divided = round_significant(divided, 2)
-            divided = int(divided) if divided >= 10 else divided
-            return '{:,}{}'.format(divided, suffix)
+    units = suffixes[multiple]
+    if traditional:
+        exponent = (size.bit_length() - 1) // 10
+    else:
+        exponent = (len(str(size)) - 1) // 3
+    exponent = min(max(exponent, 1), len(units))
+    divided = size / multiple ** exponent
+    suffix = units[exponent - 1]
+    if divided < multiple:
+        divided = round_significant_2(divided)
+        divided = int(divided) if divided >= 10 else divided
+        return '{:,}{}'.format(divided, suffix)
 
     # Greater than 1000 Yottabytes!? That is a pile of 64GB MicroSD cards
     # as large as the Great Pyramid of Giza!  You're dreaming, but in the
@@ -129,7 +149,30 @@ def round_significant(number: float, digits: int = 2) -> float:
     return round(number, ndigits)
 
 
-def xml_strip_iterparse(file_: IO[str]) -> XML:
+def round_significant_2(number: float) -> float:
+    """
+    Round positive number to two significant digits, eg::
+
+        >>> round_significant_2(1235)
+        1200.0
+
+    Same as `round_significant(number, 2)`, but uses a lookup table instead
+    of a logarithm over the range of values that `file_size()` needs.
+
+    Returns:
+        Number rounded to two significant digits
+    """
+    if number < 10_000:
+        for threshold, ndigits in ROUND_SIGNIFICANT_2:
+            if number >= threshold:
+                return round(number, ndigits)
+    return round_significant(number, 2)
+
+
+def xml_strip_iterparse(
+    file_: IO[bytes],
+    tags: Optional[Iterable[str]] = None,
+) -> XML:
     """
     Iterate the given file into XML, while stripping namespace prefixes.
 
@@ -139,7 +182,8 @@ def xml_strip_iterparse(file_: IO[str]) -> XML:
 
         >>> elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}urlset')
 
-    This function manipulates the tree so that that is no longer required.
+    This function strips namespaces as the parser reports each name, using
+    `NamespaceStripper`, so that that is no longer required.
 
         >>> elem.find('urlset')
 
@@ -149,25 +193,65 @@ def xml_strip_iterparse(file_: IO[str]) -> XML:
     Args:
         file_:
             A file-like object.
+        tags:
+            Only yield elements with these (stripped) tag names. Default is
+            to yield every element.
 
     Returns:
         A generator over input file, to allow for large inputs, yielding
-        `ElementTree.Element` objects
+        `ElementTree.Element` objects as each one is completed.
     """
-    for event, element in ElementTree.iterparse(file_):
-        # Replace 'tag' string
-        tag = element.tag
-        if tag and isinstance(tag, str) and tag[0] == '{':
-            element.tag = tag.partition('}')[2]
-
-        # Modify 'attrib' dictionary in-place
-        attrib = element.attrib
-        if attrib:
-            for name, value in list(attrib.items()):
-                if name and isinstance(name, str) and name[0] == '{':
-                    del attrib[name]
-                    attrib[name.partition('}')[2]] = value
-        yield element
+    builder = NamespaceStripper(tags)
+    parser = ElementTree.XMLParser(target=builder)
+    while chunk := file_.read(CHUNK_SIZE):
+        parser.feed(chunk)
+        completed, builder.completed = builder.completed, []
+        yield from completed
+    parser.close()
+    yield from builder.completed
+
+
+class NamespaceStripper(ElementTree.TreeBuilder):
+    """
+    Parser target that strips namespaces from tag and attribute names.
+
+    Names are stripped once, as the parser reports them, rather than by
+    rewriting every element afterwards. Completed elements are collected
+    in the `completed` list, in document order, optionally filtered down to
+    just those with the given tag names.
+
+    Children of the document's root element (ie. each <url> in a sitemap)
+    are detached from the root once completed, so that memory use stays flat
+    no matter how large the document is.
+    """
+    def __init__(self, tags: Optional[Iterable[str]] = None) -> None:
+        super().__init__()
+        self.completed: list[ElementTree.Element] = []
+        self.stack: list[ElementTree.Element] = []
+        self.tags = None if tags is None else frozenset(tags)
+
+    def start(
+        self,
+        tag: str,
+        attrs: dict[str, str],
+    ) -> ElementTree.Element:
+        if attrs:
+            attrs = {
+                name.rpartition('}')[2]: value
+                for name, value in attrs.items()
+            }
+        element = super().start(tag.rpartition('}')[2], attrs)
+        self.stack.append(element)
+        return element
+
+    def end(self, tag: str) -> ElementTree.Element:
+        element = super().end(tag.rpartition('}')[2])
+        self.stack.pop()
+        if len(self.stack) == 1:
+            self.stack[0].remove(element)
+        if self.tags is None or element.tag in self.tags:
+            self.completed.append(element)
+        return element
 
 
 class ChangeFreq(Enum):
@@ -180,17 +264,62 @@ class ChangeFreq(Enum):
     NEVER = 'never'
 
 
-@dataclass
-class Location:
+CHANGEFREQ_VALUES = frozenset(member.value for member in ChangeFreq)
+
+
+@dataclass(slots=True)
+class Sitemap:
     """
-    Collect the core fields for sitemap elements that describe an end-point.
+    The core fields of every end-point in a sitemap, as parallel lists.
+
+    Storing one list per field, rather than one object per end-point,
+    keeps allocations down and makes counting fields cheap.
 
     Used by `SitemapReader.read_sitemap()`
     """
-    loc: str
-    lastmod: Optional[str]
-    changefreq: Optional[str]
-    priority: Optional[float]
+    locs: list[str] = field(default_factory=list)
+    lastmods: list[Optional[str]] = field(default_factory=list)
+    changefreqs: list[Optional[str]] = field(default_factory=list)
+    priorities: list[Optional[float]] = field(default_factory=list)
+    invalid_changefreqs: Counter[str] = field(default_factory=Counter)
+
+    def __len__(self) -> int:
+        return len(self.locs)
+
+
+class CountingReader:
+    """
+    Wrap binary file-like object to keep count of the bytes read from it.
+    """
+    def __init__(self, file_: IO[bytes]):
+        self.file_ = file_
+        self.num_bytes = 0
+        self.pending = b''
+
+    def peek(self, size: int) -> bytes:
+        """
+        Return up to `size` bytes, without consuming them.
+        """
+        while len(self.pending) < size:
+            data = self.file_.read(size - len(self.pending))
+            if not data:
+                break
+            self.num_bytes += len(data)
+            self.pending += data
+        return self.pending[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        pending = self.pending
+        if pending:
+            if 0 <= size <= len(pending):
+                self.pending = pending[size:]
+                return pending[:size]
+            self.pending = b''
+            if size > 0:
+                size -= len(pending)
+        data = self.file_.read(size)
+        self.num_bytes += len(data)
+        return pending + data
 
 
 class Downloader:
@@ -204,9 +333,17 @@ class Downloader:
                 'https://example.com'
         """
         self.base_url = self._clean_url(base_url)
+        parts = urlsplit(self.base_url)
+        self.url_prefix = f"{parts.scheme}://{parts.netloc}"
 
-        # Allow reuse of TCP connection
+        # Allow reuse of TCP connections, keeping one per download thread
         self.session = requests.session()
+        adapter = HTTPAdapter(
+            pool_connections=MAX_WORKERS,
+            pool_maxsize=MAX_WORKERS,
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def build_url(self, path: str) -> str:
         """
@@ -220,58 +357,57 @@ class Downloader:
             Absolute URL
 
         """
-        parts = urlsplit(self.base_url)
-        if not parts.scheme:
-            parts._replace(scheme='https')
-        parts = parts._replace(path=path)
-        url = urlunsplit(parts)
-        return url
+        if not path.startswith('/'):
+            path = f"/{path}"
+        return f"{self.url_prefix}{path}"
 
-    @functools.lru_cache(maxsize=1)
-    def get_text(self, url: str) -> str:
+    def get_xml(self, url: str, tags: Optional[Iterable[str]] = None) -> XML:
         """
-        Fetch a single resource and convert to unicode string.
+        Fetch and pre-parse XML resource
+
+        The response body is streamed straight into the XML parser, so parsing
+        overlaps with the download and the document is never held in memory
+        as a whole. Gzipped sitemaps, eg. '.xml.gz' files, are detected by
+        their leading bytes and decompressed as they stream.
 
         Args:
             url:
-                Absolute URL to resource, eg. 'https://example.com/robots.txt'
+               Full URL to resource, eg. 'https://example.com/sitemap.xml'
+            tags:
+                Only yield elements with these tag names.
 
         Raises:
             RuntimeError:
-                On any network problems.
+                On any network or decompression problems.
 
         Returns:
-            Plain unicode string.
+            Iterator, as built by `xml_strip_iterparse()`
         """
         try:
             response = self.session.get(url, stream=True, timeout=5.0)
             response.raise_for_status()
-            text = response.text
-        except requests.exceptions.HTTPError as e:
-            logger.error(e)
-            raise RuntimeError(e) from None
         except requests.exceptions.RequestException as e:
             logger.error(e)
             raise RuntimeError(e) from None
 
-        logger.info('Downloaded %s from: %s', file_size(len(text)), url)
-        return text
-
-    def get_xml(self, url: str) -> XML:
-        """
-        Fetch and pre-parse XML resource
-
-        Args:
-            url:
-               Full URL to resource, eg. 'https://example.com/sitemap.xml'
-
-        Returns:
-            Iterator, as built by `xml_strip_iterparse()`
-        """
-        # Build file-like object from string for `xml.etree`
-        text = self.get_text(url)
-        file_ = io.StringIO(text)
-        yield from xml_strip_iterparse(file_)
+        with response:
+            # Undo any HTTP 'Content-Encoding' on the fly...
+            response.raw.decode_content = True
+            reader = CountingReader(response.raw)
+
+            try:
+                # ...and also any gzip compression of the file itself.
+                # Sniff rather than trust a '.gz' suffix, as some servers
+                # also set 'Content-Encoding', which has already been undone.
+                stream: IO[bytes] = reader
+                if reader.peek(2) == GZIP_MAGIC:
+                    stream = gzip.GzipFile(fileobj=reader)
+                yield from xml_strip_iterparse(stream, tags)
+            except (urllib3.exceptions.HTTPError, OSError, EOFError) as e:
+                logger.error(e)
+                raise RuntimeError(e) from None
+
+        logger.info('Downloaded %s from: %s', file_size(reader.num_bytes), url)
 
     def _clean_url(self, base_url: str) -> str:
         """
@@ -302,38 +438,65 @@ class SitemapReader:
         Print details about the sitemap index, and the sitemaps pointed to.
         """
         total_urls = 1                  # We started with '/sitemap.xml'
-        print(f"    Sitemap index found containing {len(urls):,} URLs")
-        print()
+        lines = [f"    Sitemap index found containing {len(urls):,} URLs", '']
+
+        # Download each sitemap once, concurrently...
+        unique = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(self.read_sitemap, unique)
+            sitemaps = dict(zip(unique, results))
 
+        # ...but report in original order
         for url in urls:
-            locations = self.read_sitemap(url)
-            self.print_sitemap(locations)
-            total_urls += len(locations)
+            sitemap = sitemaps[url]
+            lines.append(self.format_sitemap(sitemap))
+            total_urls += len(sitemap)
 
-        print()
-        print(f"Total of {total_urls:,} URLs found in {len(urls) + 1} files")
+        lines.append('')
+        lines.append(
+            f"Total of {total_urls:,} URLs found in {len(urls) + 1} files"
+        )
+
+        # Write report in one go
+        lines.append('')
+        sys.stdout.write('\n'.join(lines))
 
-    def print_sitemap(self, locations: List[Location]) -> None:
+    def print_sitemap(self, sitemap: Sitemap) -> None:
         """
         Print basic details about sitemap file.
         """
-        fields = ('loc', 'lastmod', 'changefreq', 'priority')
-
-        # Build count of implemented fields
-        counts: dict[str, int] = collections.Counter()
+        print(self.format_sitemap(sitemap))
 
-        for location in locations:
-            for field in fields:
-                if hasattr(location, field):
-                    counts[field] += 1
+    def format_sitemap(self, sitemap: Sitemap) -> str:
+        """
+        Build summary of sitemap file's fields.
 
-        print(
+        A single line, plus a second if any invalid values were found.
+        """
+        # Count fields actually present
+        counts = {
+            'loc': len(sitemap.locs),
+            'lastmod': sum(x is not None for x in sitemap.lastmods),
+            'changefreq': sum(x is not None for x in sitemap.changefreqs),
+            'priority': sum(x is not None for x in sitemap.priorities),
+        }
+
+        line = (
             f"    Found {counts['loc']:,} URLs, {counts['lastmod']:,} lastmod, "
             f"{counts['changefreq']:,} changefreq, and "
             f"{counts['priority']:,} priority fields"
         )
 
-    def read_index(self, path: str) -> tuple[list[str], list[Location]]:
+        # One line for all invalid values, however many URLs used them
+        if sitemap.invalid_changefreqs:
+            invalid = ', '.join(
+                f"{value!r} ({count:,})"
+                for value, count in sitemap.invalid_changefreqs.most_common()
+            )
+            line = f"{line}\n        Invalid <changefreq> values: {invalid}"
+        return line
+
+    def read_index(self, path: str) -> tuple[list[str], Sitemap]:
         """
         Extract URLs to detail sitemaps, if any, from sitemap index.
 
@@ -352,13 +515,16 @@ class SitemapReader:
                 Path to file, eg '/sitemap.xml'
 
         Returns:
-            List of URLs to sitemap files.
+            List of URLs to sitemap files, and any end-points found in the
+            file itself.
         """
 
         url = self.downloader.build_url(path)
-        data = self.downloader.get_xml(url)
+        data = self.downloader.get_xml(url, tags=('sitemap', 'url'))
 
+        # Collect both sitemaps and end-points in a single pass
         urls = []
+        sitemap = Sitemap()
         for elem in data:
             if elem.tag == 'sitemap':
                 loc = find_text(elem, 'loc')
@@ -366,14 +532,14 @@ class SitemapReader:
                     raise ValueError('Missing required <loc> element')
                 else:
                     urls.append(loc)
+            elif elem.tag == 'url':
+                self.parse_url(elem, sitemap)
 
-        locations = self.read_sitemap(url)
-
-        return (urls, locations)
+        return (urls, sitemap)
 
-    def read_sitemap(self, path: str) -> List[Location]:
+    def read_sitemap(self, path: str) -> Sitemap:
         """
-        Download sitemap file, build list of `Location` data objects.
+        Download sitemap file, build `Sitemap` data object.
 
         <urlset>
             <url>
@@ -394,29 +560,42 @@ class SitemapReader:
                 If any required elements are missing.
 
         Returns:
-            List of `Location` dataclass instances.
+            `Sitemap` dataclass instance.
         """
-        locations = []
-        data = self.downloader.get_xml(path)
+        sitemap = Sitemap()
+        data = self.downloader.get_xml(path, tags=('url',))
         for elem in data:
-            if elem.tag == 'url':
-                priority = (
-                    float(temp)
-                    if (temp := find_text(elem, 'priority'))
-                    else None
-                )
-                loc = find_text(elem, 'loc')
-                if loc is None:
-                    raise ValueError('Missing required <loc> element')
+            self.parse_url(elem, sitemap)
+        return sitemap
+
+    def parse_url(self, elem: ElementTree.Element, sitemap: Sitemap) -> None:
+        """
+        Add fields from sitemap's <url> element to given `Sitemap`.
+
+        Raises:
+            ValueError:
+                If required <loc> element is missing.
+        """
+        # Single pass over children, rather than a `find()` per field
+        children = {child.tag: child.text for child in elem}
+
+        priority = (
+            float(temp)
+            if (temp := children.get('priority'))
+            else None
+        )
+        loc = children.get('loc')
+        if loc is None:
+            raise ValueError('Missing required <loc> element')
+
+        changefreq = children.get('changefreq')
+        if changefreq is not None and changefreq not in CHANGEFREQ_VALUES:
+            sitemap.invalid_changefreqs[changefreq] += 1
 
-                location = Location(
-                    loc=loc,
-                    lastmod=find_text(elem, 'lastmod'),
-                    changefreq=find_text(elem, 'changefreq'),
-                    priority=priority,
-                )
-                locations.append(location)
-        return locations
+        sitemap.locs.append(loc)
+        sitemap.lastmods.append(children.get('lastmod'))
+        sitemap.changefreqs.append(changefreq)
+        sitemap.priorities.append(priority)
 
 
 def parse(arguments: List[str]) -> argparse.Namespace:
@@ -445,13 +624,13 @@ def main(options: argparse.Namespace) -> None:
     """
     setup_logging()
     sitemaps = SitemapReader(options.url_base)
-    urls, locations = sitemaps.read_index('/sitemap.xml')
+    urls, sitemap = sitemaps.read_index('/sitemap.xml')
 
     # Sitemap index or plain file?
     if urls:
         sitemaps.print_index(urls)
     else:
-        sitemaps.print_sitemap(locations)
+        sitemaps.print_sitemap(sitemap)
 
 
 if __name__ == '__main__':
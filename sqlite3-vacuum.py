@@ -9,30 +9,20 @@ suffix  '.old' added. For good measure, VACUUM and ANALYZE are run on the origin
 database before the backup copy is created.
 """
 
-from contextlib import contextmanager
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from contextlib import closing
 import logging
 import os
 from pathlib import Path
-import subprocess
+import sqlite3
 import sys
 
 
 logger = logging.getLogger()
 
 
-@contextmanager
-def cd(folder):
-    """
-    Context manager to change local directory.
-    """
-    previous = Path.cwd()
-    logger.debug("cd %s", folder)
-    os.chdir(str(folder))
-    try:
-        yield
-    finally:
-        logger.debug("cd %s", previous)
-        os.chdir(str(previous))
+# Limit simultaneous VACUUMs, which are heavy on disk I/O
+MAX_WORKERS = 4
 
 
 def data_folders(root):
@@ -49,31 +39,24 @@ def data_folders(root):
     root = Path(root)
     folders = []
     assert root.is_dir(), "Root must be an existing folder"
-    for path in root.iterdir():
-        if path.is_dir():
-            data = path / 'data'
-            if data.is_dir():
-                folders.append(data)
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                data = os.path.join(entry.path, 'data')
+                if os.path.isdir(data):
+                    folders.append(Path(data))
     folders.sort()
     return folders
 
 
-def run(command):
-    """
-    Run externaml command, abort on command failure.
-    """
-    logger.debug(command)
-    return subprocess.run(command, check=True, shell=True)
-
-
 def sqlite3_files(folder):
     """
     Yield '*.sqlite3' files from given directory.
     """
-    for path in folder.iterdir():
-        if path.is_file():
-            if path.suffix == '.sqlite3':
-                yield path
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.endswith('.sqlite3') and entry.is_file():
+                yield Path(entry.path)
 
 
 def backup(db):
@@ -82,14 +65,17 @@ def backup(db):
     """
     # Be careful not to overwrite previous backup until the
     # new backup has been sucessfully created.
-    backup = Path("{}.old".format(db.name))
-    previous_backup = Path("{}.older".format(db.name))
+    backup = db.with_name("{}.old".format(db.name))
+    previous_backup = db.with_name("{}.older".format(db.name))
     if backup.exists():
         logger.debug("mv {} {}".format(backup, previous_backup))
         backup.rename(previous_backup)
 
     # Create backup
-    run('sqlite3 {} ".backup \'{}\'"'.format(db.name, backup.name))
+    logger.debug("backup %s to %s", db, backup)
+    with closing(sqlite3.connect(db)) as source:
+        with closing(sqlite3.connect(backup)) as destination:
+            source.backup(destination)
 
     # Delete previous backup
     if previous_backup.exists():
@@ -101,22 +87,43 @@ def vacuum(db_file):
     """
     Do a full tidy-up of SQLite database
     """
-    command = "sqlite3 {} ".format(db_file.name)
-    run(command + 'ANALYZE;')
-    run(command + 'VACUUM;')
+    # Autocommit mode, as VACUUM cannot be run inside a transaction
+    with closing(sqlite3.connect(db_file, isolation_level=None)) as connection:
+        logger.debug("ANALYZE %s", db_file)
+        connection.execute('ANALYZE')
+        logger.debug("VACUUM %s", db_file)
+        connection.execute('VACUUM')
+
+
+def vacuum_and_backup(db_file):
+    """
+    Tidy-up then backup a single database.
+    """
+    vacuum(db_file)
+    backup(db_file)
 
 
 def main(root):
     """
     Tidy up and backup every SQLite database found across all projects.
+
+    Databases are independent of each other, so are processed in parallel.
     """
-    for folder in data_folders(root):
-        project = folder.parent.name
-        logger.info("Backup database for %s", project)
-        for db_file in sqlite3_files(folder):
-            with cd(db_file.parent):
-                vacuum(db_file)
-                backup(db_file)
+    db_files = [
+        db_file
+        for folder in data_folders(root)
+        for db_file in sqlite3_files(folder)
+    ]
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(vacuum_and_backup, db_file): db_file
+            for db_file in db_files
+        }
+        for future in as_completed(futures):
+            future.result()
+            db_file = futures[future]
+            project = db_file.parent.parent.name
+            logger.info("Backup database for %s: %s", project, db_file.name)
     return 0
 
 
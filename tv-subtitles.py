@@ -8,56 +8,97 @@ Produces exactly one english SRT subtitle per episode.
 from __future__ import annotations
 
 import argparse
-from functools import total_ordering
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from operator import attrgetter
 import os.path
 from pathlib import Path
 from pprint import pprint as pp
 import re
 import shutil
+import stat
 import sys
+import threading
+from typing import Iterable, Iterator
 
 
 logger = logging.getLogger()
 
+# Episodes are handled concurrently, as the work is mostly filesystem waits
+MAX_WORKERS = 8
+
+# Folders and files in a folder, as sorted (casefolded, name) pairs
+Contents = tuple[list[tuple[str, str]], list[tuple[str, str]]]
+
+# Episode key, eg. 'S02E13', found anywhere within a file name
+KEY_REGEX = re.compile(r'S\d+E\d+', flags=re.IGNORECASE)
+
+
+def extract_key(name: str) -> str|None:
+    """
+    Extract episode's 'key' from file name.
+
+    The key is an upper-case string in the format 'S00E00', which
+    uniquely identifies an episode within a series.
+
+    Args:
+        name:
+            File name.
+
+    Returns:
+        The key if found, otherwise None.
+    """
+    if match := KEY_REGEX.search(name):
+        return match.group(0).upper()
+    return None
+
 
-@total_ordering
 class EpisodeName:
-    KEY_REGEX = re.compile(r'S(\d+)E(\d+)', flags=re.IGNORECASE)
     SUBTITLE_SUFFIX = '.srt'
 
     def __init__(self, name: str):
         self.name = name
+        self.key = extract_key(name)
+        dot = name.rfind('.')
+        base = name[:dot] if dot > 0 else name
+        self.subtitle_name = f"{base}{self.SUBTITLE_SUFFIX}"
+        self.destination: tuple[Path, Path]|None = None
 
-    def get_key(self) -> str|None:
+    def destination_for(self, root: Path) -> Path:
         """
-        Extract episode's 'key' from file name.
+        Path to expected subtitle file, if episode is under root.
 
-        The key is an upper-case string in the format 'S00E00', which
-        uniquely identifies an episode within a series.
+        The path is kept, so repeated calls with the same root are cheap.
 
         Args:
-            name:
-                File name.
+            root:
+                Folder containing episode.
+
+        Returns:
+            Path to subtitle file, which may not yet exist.
+        """
+        cached = self.destination
+        if cached is None or cached[0] != root:
+            cached = self.destination = (root, root / self.subtitle_name)
+        return cached[1]
+
+    def get_key(self) -> str|None:
+        """
+        Episode's 'key', extracted from file name.
 
         Returns:
             The key if found, otherwise None.
         """
-        key = None
-        if match := self.KEY_REGEX.search(self.name):
-            key = match.group(0)
-        return None if key is None else key.upper()
+        return self.key
 
     def get_subtitle_name(self) -> str:
         """
-        Build expected subtitle file name for episode.
+        Expected subtitle file name for episode.
 
         Returns:
             Expected file name of subtitle.
         """
-        base, suffix = os.path.splitext(self.name)
-        subtitle = f"{base}{self.SUBTITLE_SUFFIX}"
-        return subtitle
+        return self.subtitle_name
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, EpisodeName):
@@ -80,12 +121,19 @@ class Folder:
     """
     Basic folder operations.
     """
-    def __init__(self, folder: Path):
+    def __init__(self, folder: Path, contents: Contents|None = None):
         """
         Initialiser.
 
         Reads contents of folder into properties.
 
+        Args:
+            folder:
+                Path to folder.
+            contents:
+                Contents already read from folder, if any, to avoid
+                reading it again.
+
         Raises:
             RuntimeError:
                 If given folder does not appear to contain a TV series.
@@ -93,39 +141,51 @@ class Folder:
         Returns:
             None
         """
-        if not folder.is_dir():
-            raise RuntimeError(f"Path is not a folder: {folder}")
+        if contents is None:
+            if not folder.is_dir():
+                raise RuntimeError(f"Path is not a folder: {folder}")
+            contents = self._read_contents(folder)
         self.root = folder
-        self.folders, self.files = self._read_contents(self.root)
-
-    def _read_contents(
-        self,
-        root: Path
-    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        self.contents = contents
+        folders, files = contents
+        self.folders = tuple(name for _, name in folders)
+        self.files = tuple(name for _, name in files)
+        self.file_names = frozenset(self.files)
+
+        # Case-insensitive folder lookup, first in sorted order wins
+        self.folders_casefold: dict[str, str] = {}
+        for folded, name in folders:
+            self.folders_casefold.setdefault(folded, name)
+
+    def _read_contents(self, root: Path) -> Contents:
         """
         Find the files and folders under root.
 
+        Each name is casefolded exactly once, here.
+
         Returns:
-            Both the folders and files as sorted strings.
+            Both the folders and files as sorted (casefolded, name) pairs.
         """
         folders = []
         files = []
-        for entry in root.iterdir():
-            # Skip hidden
-            if entry.name.startswith('.'):
-                continue
-
-            # Build lists
-            if entry.is_dir():
-                folders.append(entry.name)
-            elif entry.is_file():
-                files.append(entry.name)
-            else:
-                logger.warning(f"Ignoring non-regular file: {entry}")
-
-        folders.sort(key=str.casefold)
-        files.sort(key=str.casefold)
-        return (tuple(folders), tuple(files))
+        with os.scandir(root) as entries:
+            for entry in entries:
+                # Skip hidden
+                if entry.name.startswith('.'):
+                    continue
+
+                # Build lists
+                name = entry.name
+                if entry.is_dir():
+                    folders.append((name.casefold(), name))
+                elif entry.is_file():
+                    files.append((name.casefold(), name))
+                else:
+                    logger.warning(f"Ignoring non-regular file: {entry.path}")
+
+        folders.sort()
+        files.sort()
+        return (folders, files)
 
 
 class SeriesFolder(Folder):
@@ -150,7 +210,7 @@ class SeriesFolder(Folder):
         """
         super().__init__(folder)
         self.episodes = self._find_episodes(self.files)
-        self.subtitle_finder = SubtitleFinder(options.folder)
+        self.subtitle_finder = SubtitleFinder.from_folder(self)
 
         if len(self.episodes) < 2:
             raise RuntimeError(f"Folder doesn't contain episodes: {folder}")
@@ -176,7 +236,7 @@ class SeriesFolder(Folder):
         Returns:
             Nothing.
         """
-        destination = self.root / episode.get_subtitle_name()
+        destination = episode.destination_for(self.root)
         shutil.copy2(subtitle, destination)
         logger.info("Create: %s", destination.name)
 
@@ -193,12 +253,20 @@ class SeriesFolder(Folder):
         Returns:
             True only if a properly-named subtitle exists for all episodes.
         """
-        have_subtitles = (self.has_subtitle(name) for name in self.episodes)
-        return all(have_subtitles)
+        return not self.missing_episodes()
 
     def has_subtitle(self, episode: EpisodeName) -> bool:
         return self.subtitle_finder.has_subtitle(episode)
 
+    def missing_episodes(self) -> list[EpisodeName]:
+        """
+        Find episodes without a properly-named subtitle.
+
+        Returns:
+            Possibly empty list of episodes, in order.
+        """
+        return [e for e in self.episodes if not self.has_subtitle(e)]
+
     def _find_episodes(self, files: tuple[str, ...]) -> list[EpisodeName]:
         """
         Find video files that match the 'S00E00' convention.
@@ -218,13 +286,11 @@ class SeriesFolder(Folder):
         """
         episodes = []
         seen = set()
-        for name in self.files:
-            _, suffix = os.path.splitext(name)
-            if suffix not in self.VIDEO_SUFFIXES:
+        for name in files:
+            if not name.lower().endswith(self.VIDEO_SUFFIXES):
                 continue
 
-            episode = EpisodeName(name)
-            key = episode.get_key()
+            key = extract_key(name)
             if key is None:
                 continue
 
@@ -232,10 +298,10 @@ class SeriesFolder(Folder):
                 message = f"Duplicate episode video files found for {key!r}"
                 raise RuntimeError(message)
 
-            episodes.append(episode)
+            episodes.append(EpisodeName(name))
             seen.add(key)
 
-        episodes.sort()
+        episodes.sort(key=attrgetter('name'))
         return episodes
 
 
@@ -243,6 +309,31 @@ class SubtitleFinder(Folder):
     SUBTITLE_MIN_SIZE = 10_000          # bytes
     SUBTITLE_SUFFIX = '.srt'
 
+    def __init__(self, folder: Path, contents: Contents|None = None):
+        """
+        Initialiser.
+
+        The 'Subs' folder is only read when first needed, then kept.
+        """
+        super().__init__(folder, contents)
+        self.subs_index: dict[str, list[Path]]|None = None
+        self.subs_irregular: dict[str, str] = {}
+        self.subs_lock = threading.Lock()
+
+    @classmethod
+    def from_folder(cls, other: Folder) -> SubtitleFinder:
+        """
+        Alternative constructor, reusing contents already read by other.
+
+        Args:
+            other:
+                Folder whose contents have already been read.
+
+        Returns:
+            New instance, sharing root and contents with other.
+        """
+        return cls(other.root, other.contents)
+
     def find_subtitle(self, episode: EpisodeName) -> Path:
         """
         Pick best subtitle for given episode.
@@ -269,45 +360,52 @@ class SubtitleFinder(Folder):
         if len(subtitles) == 1:
             return subtitles[0]
 
-        # Narrow by language
-        subtitles = self.filter_language(subtitles)
-
-        # Drop files that are too-small
-        subtitles = self.filter_small(subtitles)
+        # Narrow by language and drop files that are too-small
+        sized = list(self.filter_subtitles(subtitles))
 
         # Exactly two? Drop largest
-        if len(subtitles) == 2:
-            if os.path.getsize(subtitles[0]) > os.path.getsize(subtitles[1]):
-                subtitles = [subtitles[1]]
+        if len(sized) == 2:
+            if sized[0][1] > sized[1][1]:
+                sized = [sized[1]]
             else:
-                subtitles = [subtitles[0]]
+                sized = [sized[0]]
 
         # Only one again?
-        if len(subtitles) == 1:
-            return subtitles[0]
+        if len(sized) == 1:
+            return sized[0][0]
 
-        raise NotImplementedError(f"Found {len(subtitles)} subtitles for {episode}")
+        raise NotImplementedError(f"Found {len(sized)} subtitles for {episode}")
 
-    def filter_language(self, paths: List[Path]) -> List[Path]:
-        """
-        Filter out non-english subtitles.
+    def filter_subtitles(
+        self,
+        paths: Iterable[Path],
+    ) -> Iterator[tuple[Path, int]]:
         """
-        english = []
-        for path in paths:
-            lowercase = path.name.casefold()
-            if 'english' in lowercase or 'eng' in lowercase:
-                english.append(path)
-        return english
+        Filter out non-english subtitles, and those that are too small.
 
-    def filter_small(self, paths: List[Path]) -> List[Path]:
-        """
-        Drop subtitles that are too small.
+        Done in a single pass, only calling stat() on english subtitles.
+
+        Args:
+            paths:
+                Candidate subtitle paths.
+
+        Returns:
+            Iterator over (path, size) pairs, so callers needn't stat again.
         """
-        large = []
         for path in paths:
-            if os.path.getsize(path) > self.SUBTITLE_MIN_SIZE:
-                large.append(path)
-        return large
+            # Matches 'english' too
+            if 'eng' not in path.name.casefold():
+                continue
+
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if not stat.S_ISREG(info.st_mode):
+                continue
+
+            if info.st_size > self.SUBTITLE_MIN_SIZE:
+                yield (path, info.st_size)
 
     def has_subtitle(self, episode: EpisodeName) -> bool:
         """
@@ -320,8 +418,7 @@ class SubtitleFinder(Folder):
         Return:
             True if a matching subtitle exists for the given episode.
         """
-        subtitle_path = self.root / episode.get_subtitle_name()
-        return True if subtitle_path.is_file() else False
+        return episode.subtitle_name in self.file_names
 
     def list_subtitles(self, episode: EpisodeName) -> list[Path]:
         """
@@ -336,7 +433,7 @@ class SubtitleFinder(Folder):
         """
         # In its proper place?
         if self.has_subtitle(episode):
-            subtitle = self.root / episode.get_subtitle_name()
+            subtitle = episode.destination_for(self.root)
             assert subtitle.is_file(), f"Subtitle file not found: {subtitle}"
             return [subtitle]
 
@@ -365,37 +462,84 @@ class SubtitleFinder(Folder):
             Possibly empty list of paths.
         """
         # Abort early if no 'subs' folder found
-        subfolder = None
-        for name in self.folders:
-            if name.casefold() == 'subs':
-                subfolder = self.root / name
-
-        if subfolder is None:
+        name = self.folders_casefold.get('subs')
+        if name is None:
             return []
+        subfolder = self.root / name
+
+        # Read subs folder just once, shared between threads
+        with self.subs_lock:
+            if self.subs_index is None:
+                self.subs_index, self.subs_irregular = (
+                    self._index_subs_folder(subfolder)
+                )
+
+        # Only fail the episodes that are actually affected
+        if episode_key in self.subs_irregular:
+            path = self.subs_irregular[episode_key]
+            raise RuntimeError(f"Non-regular file found: {path}")
+        subtitles = list(self.subs_index.get(episode_key, []))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s subtitle(s) found for %s under '%s/%s/'",
+                len(subtitles),
+                episode_key,
+                subfolder.parent.name,
+                subfolder.name,
+            )
+        return subtitles
 
-        # Look in subs folder
-        subtitles: list[Path] = []
+    def _index_subs_folder(
+        self,
+        subfolder: Path,
+    ) -> tuple[dict[str, list[Path]], dict[str, str]]:
+        """
+        Find every subtitle in 'Subs' folder, grouped by episode key.
 
-        for entry in subfolder.iterdir():
-            entry_key = EpisodeName(entry.name).get_key()
-            if entry_key != episode_key:
-                continue
+        Args:
+            subfolder:
+                Path to 'Subs' folder.
 
-            # Match found
-            if entry.is_dir():
-                subtitles.extend(entry.glob(f"*{self.SUBTITLE_SUFFIX}"))
-            elif entry.is_file():
-                subtitles.append(entry)
-            else:
-                raise RuntimeError("Non-regular file found: {entry}")
-
-        logger.debug(
-            "%s subtitle(s) found for %s under '%s/%s/'",
-            len(subtitles),
-            episode_key,
-            subfolder.parent.name,
-            subfolder.name,
-        )
+        Returns:
+            Dictionary mapping episode key to list of subtitle paths, and
+            another mapping episode key to any non-regular file found.
+        """
+        index: dict[str, list[Path]] = {}
+        irregular: dict[str, str] = {}
+        with os.scandir(subfolder) as entries:
+            for entry in entries:
+                key = extract_key(entry.name)
+                if key is None:
+                    continue
+
+                subtitles = index.setdefault(key, [])
+                if entry.is_dir():
+                    subtitles.extend(self._list_subtitle_files(entry.path))
+                elif entry.is_file():
+                    subtitles.append(Path(entry.path))
+                else:
+                    irregular[key] = entry.path
+        return (index, irregular)
+
+    def _list_subtitle_files(self, folder: str) -> list[Path]:
+        """
+        Find subtitle files directly inside folder.
+
+        Args:
+            folder:
+                Path to folder.
+
+        Returns:
+            Possibly empty list of paths.
+        """
+        subtitles = []
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.SUBTITLE_SUFFIX):
+                    continue
+                if entry.is_file():
+                    subtitles.append(Path(entry.path))
         return subtitles
 
 
@@ -417,19 +561,44 @@ def argparse_existing_folder(string: str) -> Path:
     return path
 
 
+def copy_episode_subtitle(folder: SeriesFolder, episode: EpisodeName) -> bool:
+    """
+    Find the best subtitle for episode and copy it into place.
+
+    Args:
+        folder:
+            Series folder containing episode.
+        episode:
+            Episode missing its subtitle.
+
+    Returns:
+        True if subtitle was copied, False if none could be found.
+    """
+    try:
+        subtitle = folder.find_subtitle(episode)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return False
+    folder.copy_subtitle(episode, subtitle)
+    return True
+
+
 def main(options: argparse.Namespace) -> int:
     folder = SeriesFolder(options.folder)
-    if folder.has_every_subtitle():
+    missing = folder.missing_episodes()
+    if not missing:
         print("All subtitles in place, exiting.")
         return 0
 
-    for episode in folder.episodes:
-        if folder.has_subtitle(episode):
-            continue
-        subtitle = folder.find_subtitle(episode)
-        folder.copy_subtitle(episode, subtitle)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        copied = executor.map(
+            copy_episode_subtitle,
+            [folder] * len(missing),
+            missing,
+        )
+        success = all(list(copied))
 
-    return 0
+    return 0 if success else 1
 
 
 def parse(arguments: list[str]) -> argparse.Namespace: